@@ -0,0 +1,34 @@
+import pytest
+from dotenv import load_dotenv
+
+# Loaded once when pytest collects the suite, so every module sees the same environment
+load_dotenv()
+
+
+# The tools below keep no per-instance state, so one instance serves the whole session
+@pytest.fixture(scope="session")
+def send_email_tool():
+    from tools import SendEmailTool
+
+    return SendEmailTool()
+
+
+@pytest.fixture(scope="session")
+def tavily_search_tool():
+    from tools import TavilySearchTool
+
+    return TavilySearchTool()
+
+
+@pytest.fixture(scope="session")
+def template_tool():
+    from tools import TemplateTool
+
+    return TemplateTool()
+
+
+@pytest.fixture(scope="session")
+def write_file_tool():
+    from tools import WriteFileTool
+
+    return WriteFileTool()
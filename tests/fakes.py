@@ -0,0 +1,40 @@
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass(slots=True)
+class FakeBitmap:
+    width: int
+    height: int
+    buffer: bytes
+    stride: int
+    mode: str
+    format: int
+    closed_by: Optional[str] = None
+
+    def close(self):
+        self.closed_by = threading.current_thread().name
+
+
+@dataclass(slots=True)
+class FakePage:
+    bitmap: Optional[FakeBitmap] = None
+    size: tuple = (595, 842)
+
+    def get_size(self):
+        return self.size
+
+    def render(self, **kwargs):
+        return self.bitmap
+
+
+@dataclass(slots=True)
+class FakePdfDocument:
+    pages: list = field(default_factory=list)
+
+    def __len__(self):
+        return len(self.pages)
+
+    def get_page(self, index):
+        return self.pages[index]
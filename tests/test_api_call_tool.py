@@ -0,0 +1,93 @@
+import pytest
+from langsmith import unit
+from requests.cookies import MockRequest, MockResponse
+
+from tools.APICallTool import APICallTool, do_request, endpoint_not_none, get_session
+
+API_URL = "https://api.example.com"
+
+
+@unit
+def test_session_does_not_carry_cookies_between_calls(requests_mock):
+    requests_mock.get(
+        f"{API_URL}/first", json={}, headers={"Set-Cookie": "JSESSIONID=userA; Path=/"}
+    )
+    requests_mock.get(f"{API_URL}/second", json={})
+
+    response = do_request(None, "/first", {"Authorization": "Bearer A"}, "GET", API_URL)
+    # mocked responses have no original response, so feed the jar as Session.send would
+    get_session().cookies.extract_cookies(
+        MockResponse(response.raw.headers), MockRequest(response.request)
+    )
+    do_request(None, "/second", {"Authorization": "Bearer B"}, "GET", API_URL)
+
+    assert [
+        request.headers.get("Cookie") for request in requests_mock.request_history
+    ] == [None, None]
+
+
+@unit
+@pytest.mark.parametrize(
+    "endpoint, query_params, expected_path",
+    [
+        ("/api", '{"q": "a&b=c#d", "n": 1}', "/api?q=a%26b%3Dc%23d&n=1"),
+        ("/api", '{"name": "John Doe"}', "/api?name=John%20Doe"),
+        ("/api", '{"ids": ["1", "2"]}', "/api?ids=1,2"),
+        ("/api?x=1", '{"y": "z"}', "/api?x=1&y=z"),
+        ("/api", "{}", "/api"),
+        ("/api", '{"q": null}', None),
+        ("/api", '{"q": {"a": 1}}', None),
+    ],
+    ids=[
+        "reserved_characters",
+        "spaces",
+        "list_value",
+        "existing_query",
+        "empty",
+        "null_value",
+        "object_value",
+    ],
+)
+def test_query_params_encoding(requests_mock, endpoint, query_params, expected_path):
+    requests_mock.get(f"{API_URL}/api", json={})
+    input_params = {
+        "url": API_URL,
+        "endpoint": endpoint,
+        "method": "GET",
+        "query_params": query_params,
+    }
+
+    result = APICallTool().run(input_params)
+
+    if expected_path is None:
+        assert result == {
+            "error": "query param q must be a string, number, boolean or list"
+        }
+        assert not requests_mock.called
+        return
+    assert result["requestStatusCode"] == 200
+    assert requests_mock.last_request.url == API_URL + expected_path
+
+
+@unit
+@pytest.mark.parametrize(
+    "endpoint, method, expected",
+    [
+        (None, None, (None, None)),
+        ("GET /x", None, ("/x", "GET")),
+        ("POST /x", "", ("/x", "POST")),
+        ("POST /x", "GET", ("/x", "GET")),
+        ("GETX/foo", None, ("GETX/foo", None)),
+        ("/x", "POST", ("/x", "POST")),
+    ],
+    ids=[
+        "none",
+        "get_prefix",
+        "post_prefix",
+        "explicit_method",
+        "glued_prefix",
+        "no_prefix",
+    ],
+)
+def test_endpoint_not_none(endpoint, method, expected):
+    assert endpoint_not_none(endpoint, method) == expected
@@ -1,11 +1,24 @@
+import os
+import shutil
+import tempfile
 import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
 
-from tools.CodbarTool import CodbarTool
+from PIL import Image
+
+from tools.CodbarTool import CodbarTool, _decode_cached
+
+
+def _fake_decode(img):
+    # the image width stands in for the barcode, so each test file decodes to its own value
+    return [SimpleNamespace(data=str(img.width).encode("utf-8"))]
 
 
 class TestCodbarTool(unittest.TestCase):
-    def setUp(self):
-        self.tool = CodbarTool()
+    @classmethod
+    def setUpClass(cls):
+        cls.tool = CodbarTool()
 
     def test_decode_single_barcode(self):
         input_params = {"filepath": ["./resources/images/barcode1.png"]}
@@ -26,5 +39,52 @@ class TestCodbarTool(unittest.TestCase):
         self.assertEqual(result, expected_output)
 
 
+class TestCodbarToolDecoding(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tool = CodbarTool()
+
+    def setUp(self):
+        _decode_cached.cache_clear()
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def _write_image(self, name, width):
+        path = os.path.join(self.tmpdir, name)
+        Image.new("RGB", (width, 10), "white").save(path)
+        return path
+
+    @patch("pyzbar.pyzbar.decode", side_effect=_fake_decode)
+    def test_unchanged_file_is_decoded_once(self, mock_decode):
+        path = self._write_image("barcode.png", 11)
+        self.assertEqual(self.tool.run({"filepath": [path]}), {"message": ["11"]})
+        self.assertEqual(self.tool.run({"filepath": [path]}), {"message": ["11"]})
+        self.assertEqual(mock_decode.call_count, 1)
+
+    @patch("pyzbar.pyzbar.decode", side_effect=_fake_decode)
+    def test_rewritten_file_is_decoded_again(self, mock_decode):
+        path = self._write_image("barcode.png", 11)
+        self.assertEqual(self.tool.run({"filepath": [path]}), {"message": ["11"]})
+        mtime_ns = os.stat(path).st_mtime_ns
+        self._write_image("barcode.png", 22)
+        # a coarse filesystem clock could keep the old mtime, move it forward explicitly
+        os.utime(path, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+        self.assertEqual(self.tool.run({"filepath": [path]}), {"message": ["22"]})
+        self.assertEqual(mock_decode.call_count, 2)
+
+    @patch("pyzbar.pyzbar.decode", side_effect=_fake_decode)
+    def test_concurrent_decoding_keeps_input_order(self, mock_decode):
+        paths = [
+            self._write_image(f"barcode{width}.png", width)
+            for width in range(30, 10, -1)
+        ]
+        paths.insert(5, os.path.join(self.tmpdir, "missing.png"))
+        result = self.tool.run({"filepath": paths})
+        self.assertEqual(
+            result, {"message": [str(width) for width in range(30, 10, -1)]}
+        )
+        self.assertEqual(mock_decode.call_count, 20)
+
+
 if __name__ == '__main__':
     unittest.main()
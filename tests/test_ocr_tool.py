@@ -1,28 +1,63 @@
+import io
 import os
+import tempfile
+import threading
 import unittest
-from unittest.mock import patch, MagicMock
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
 
+import pybase64
+from PIL import Image
 from langsmith import unit
 
-from tools.OcrTool import convert_to_pil_img, get_image_payload_item, checktype, read_mime, OcrTool
+from fakes import FakeBitmap, FakePage, FakePdfDocument
+from tools.OcrTool import (convert_to_pil_img, get_image_payload_item, checktype, read_mime, build_messages,
+                           get_render_scale, pil_image_to_base64, recopile_files, get_file_path, _guess_mime_cached,
+                           get_llm, OcrTool)
 
 IMAGE_JPEG = 'image/jpeg'
+_TMPDIR = tempfile.gettempdir()
+_OCR_TEST_IMAGE = os.path.join(_TMPDIR, 'img_ocr_test.png')
+
+
+def _is_jpeg(data):
+    return data[:3] == b'\xff\xd8\xff'
+
+
+def _write_tmp_image(suffix, fmt, image):
+    # encode first, so a failing save does not leave an empty temp file behind
+    buffer = io.BytesIO()
+    image.save(buffer, fmt)
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    with os.fdopen(fd, 'wb') as file:
+        file.write(buffer.getbuffer())
+    return path
+
+
+def _rgb_bitmap():
+    # a new fake per page, close() records state on it
+    return FakeBitmap(width=100, height=100, buffer=b'\x00' * (100 * 100 * 3), stride=300, mode='RGB', format=2)
 
 
 class TestOcrTool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.img_red = Image.new('RGB', (100, 100), 'red')
+        cls.img_blue = Image.new('RGB', (100, 100), 'blue')
+        cls.img_green = Image.new('RGB', (100, 100), 'green')
+        cls.img_yellow = Image.new('RGB', (100, 100), 'yellow')
+
+    def setUp(self):
+        _guess_mime_cached.cache_clear()
+        get_llm.cache_clear()
+
     @unit
     def test_convert_to_pil_img(self):
-        # Mocking a bitmap object
-        mock_bitmap = MagicMock()
-        mock_bitmap.width = 100
-        mock_bitmap.height = 100
-        mock_bitmap.buffer = b'\x00' * (100 * 100 * 4)
-        mock_bitmap.format = 2
-        mock_bitmap.mode = 'RGBA'
-        mock_bitmap.stride = 400
+        bitmap = FakeBitmap(width=100, height=100, buffer=b'\x00' * (100 * 100 * 4), stride=400, mode='RGBA',
+                            format=2)
 
         # Testing the conversion function
-        pil_image = convert_to_pil_img(mock_bitmap)
+        pil_image = convert_to_pil_img(bitmap)
         self.assertEqual(pil_image.size, (100, 100))
         self.assertFalse(pil_image.readonly)
 
@@ -39,6 +74,109 @@ class TestOcrTool(unittest.TestCase):
         }
         self.assertEqual(get_image_payload_item(img_b64, mime), expected_output)
 
+    @unit
+    def test_build_messages(self):
+        messages = build_messages(['b64_page_1', 'b64_page_2'], 'What is the total?')
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(messages[0]['content'], [get_image_payload_item('b64_page_1', IMAGE_JPEG),
+                                                  get_image_payload_item('b64_page_2', IMAGE_JPEG)])
+        self.assertEqual(messages[1], {"role": "user", "content": 'What is the total?'})
+
+    @unit
+    def test_build_messages_duplicated_images(self):
+        # identical pages (e.g. two equal line-item pages) must all reach the model, in order
+        messages = build_messages(['b64_page_1', 'b64_page_2', 'b64_page_1'], 'What is the total?')
+        self.assertEqual(messages[0]['content'], [get_image_payload_item('b64_page_1', IMAGE_JPEG),
+                                                  get_image_payload_item('b64_page_2', IMAGE_JPEG),
+                                                  get_image_payload_item('b64_page_1', IMAGE_JPEG)])
+
+    @unit
+    def test_get_render_scale(self):
+        self.assertEqual(get_render_scale(FakePage(size=(595, 842))), 2)  # A4
+        self.assertAlmostEqual(get_render_scale(FakePage(size=(842, 1191))), 2048 / 1191)  # A3
+        self.assertEqual(get_render_scale(FakePage(size=(2384, 3370))), 1)  # A0
+
+    @unit
+    def test_pil_image_to_base64(self):
+        result = pil_image_to_base64(self.img_red)
+        self.assertTrue(_is_jpeg(pybase64.b64decode(result, validate=True)))
+
+    @unit
+    def test_recopile_files_pdf(self):
+        pdf = FakePdfDocument([FakePage(_rgb_bitmap()), FakePage(_rgb_bitmap())])
+        base64_images = []
+        with patch('pypdfium2.PdfDocument', return_value=pdf):
+            recopile_files(base64_images, 'application/pdf', 'dummy.pdf')
+        self.assertEqual(len(base64_images), 2)
+
+    @unit
+    def test_recopile_files_pdf_closes_bitmaps_on_caller_thread(self):
+        bitmaps = [_rgb_bitmap() for _ in range(12)]
+        pdf = FakePdfDocument([FakePage(bitmap) for bitmap in bitmaps])
+        base64_images = []
+        with patch('pypdfium2.PdfDocument', return_value=pdf):
+            recopile_files(base64_images, 'application/pdf', 'dummy.pdf')
+        self.assertEqual(len(base64_images), 12)
+        self.assertEqual({bitmap.closed_by for bitmap in bitmaps}, {threading.current_thread().name})
+
+    @unit
+    def test_recopile_files_images(self):
+        cases = [
+            ('JPEG', '.jpeg', IMAGE_JPEG, self.img_red),
+            ('PNG', '.png', 'image/png', self.img_blue),
+            ('WEBP', '.webp', 'image/webp', self.img_green),
+            ('GIF', '.gif', 'image/gif', self.img_yellow),
+        ]
+
+        def run_case(case):
+            fmt, suffix, mime, image = case
+            path = _write_tmp_image(suffix, fmt, image)
+            try:
+                base64_images = []
+                recopile_files(base64_images, mime, path)
+                return base64_images
+            finally:
+                os.remove(path)
+
+        # the cases are independent and I/O bound, run them concurrently
+        with ThreadPoolExecutor(max_workers=len(cases)) as executor:
+            for case, base64_images in zip(cases, executor.map(run_case, cases)):
+                with self.subTest(fmt=case[0]):
+                    self.assertEqual(len(base64_images), 1)
+                    self.assertTrue(_is_jpeg(pybase64.b64decode(base64_images[0], validate=True)))
+
+    @unit
+    def test_recopile_files_mislabeled_webp(self):
+        # a WebP saved with a .jpg extension must still be converted, not sent as JPEG
+        path = _write_tmp_image('.jpg', 'WEBP', self.img_green)
+        try:
+            mime = read_mime(path)
+            self.assertEqual(mime, IMAGE_JPEG)
+            base64_images = []
+            recopile_files(base64_images, mime, path)
+        finally:
+            os.remove(path)
+        self.assertEqual(len(base64_images), 1)
+        self.assertTrue(_is_jpeg(pybase64.b64decode(base64_images[0], validate=True)))
+
+    @unit
+    def test_recopile_files_oversized_jpeg_keeps_orientation(self):
+        # orientation 6: the camera stored the photo rotated, viewers turn it 90 degrees
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        buffer = io.BytesIO()
+        Image.new('RGB', (4200, 40), 'red').save(buffer, 'JPEG', exif=exif)
+        fd, path = tempfile.mkstemp(suffix='.jpg')
+        with os.fdopen(fd, 'wb') as file:
+            file.write(buffer.getbuffer())
+        try:
+            base64_images = []
+            recopile_files(base64_images, IMAGE_JPEG, path)
+        finally:
+            os.remove(path)
+        with Image.open(io.BytesIO(pybase64.b64decode(base64_images[0], validate=True))) as result:
+            self.assertEqual(result.size, (20, 2100))
+
     @unit
     def test_checktype(self):
         valid_mimes = [IMAGE_JPEG, 'image/png', 'image/webp', 'image/gif', 'application/pdf']
@@ -52,21 +190,69 @@ class TestOcrTool(unittest.TestCase):
         with self.assertRaises(Exception):
             checktype('dummy_url', invalid_mime)
 
+    @unit
+    def test_read_mime(self):
+        cases = [
+            ('PNG', self.img_blue, 'image/png'),  # found by the magic numbers
+            ('BMP', self.img_red, 'image/bmp'),  # found by filetype
+        ]
+        for fmt, image, mime in cases:
+            with self.subTest(fmt=fmt):
+                path = _write_tmp_image('.bin', fmt, image)
+                try:
+                    self.assertEqual(read_mime(path), mime)
+                finally:
+                    os.remove(path)
+
+    @unit
+    def test_read_mime_unknown_content(self):
+        fd, path = tempfile.mkstemp(suffix='.bin')
+        with os.fdopen(fd, 'wb') as file:
+            file.write(b'plain text, not an image')
+        try:
+            self.assertIsNone(read_mime(path))
+        finally:
+            os.remove(path)
+
+    @unit
+    def test_read_mime_missing_file(self):
+        fd, path = tempfile.mkstemp(suffix='.bin')
+        os.close(fd)
+        os.remove(path)
+        self.assertIsNone(read_mime(path))
+
     @patch('filetype.guess')
     @unit
-    def test_read_mime(self, mock_guess):
-        mock_guess.return_value = MagicMock(mime=IMAGE_JPEG)
-        self.assertEqual(read_mime('dummy_path'), IMAGE_JPEG)
-        mock_guess.return_value = None
-        self.assertIsNone(read_mime('dummy_path'))
+    def test_read_mime_known_extension(self, mock_guess):
+        self.assertEqual(read_mime('dummy_path.JPG'), IMAGE_JPEG)
+        self.assertEqual(read_mime('dummy_path.pdf'), 'application/pdf')
+        mock_guess.assert_not_called()
+
+    @patch('os.path.isfile', side_effect=[True])
+    @unit
+    def test_get_file_path_app_prefix(self, mock_isfile):
+        self.assertEqual(get_file_path({'path': '/tmp/doc.pdf'}), '/app/tmp/doc.pdf')
+
+    @patch('os.path.isfile', side_effect=[False, False, True])
+    @unit
+    def test_get_file_path_fallback(self, mock_isfile):
+        self.assertEqual(get_file_path({'path': '/tmp/doc.pdf'}), '/tmp/doc.pdf')
+
+    @patch('os.path.isfile', return_value=False)
+    @unit
+    def test_get_file_path_not_found(self, mock_isfile):
+        with self.assertRaises(FileNotFoundError):
+            get_file_path({'path': '/tmp/doc.pdf'})
 
+    @unittest.skipUnless(os.environ.get("COPILOT_RUN_OCR_E2E") == "1",
+                         "integration test, downloads an image and calls the vision model")
     @unit
     def test_ocr_tool_run(self):
         image_url = 'https://docs.etendo.software/latest/assets/home/index/cover-welcome-to-etendo.png'
-        os.system(f'wget -O /tmp/img_ocr_test.png {image_url}')
+        os.system(f'wget -O {_OCR_TEST_IMAGE} {image_url}')
 
         ocr_tool = OcrTool()
-        input_params = {'path': '/tmp/img_ocr_test.png', 'question': 'Describe the image and its content in detail.'}
+        input_params = {'path': _OCR_TEST_IMAGE, 'question': 'Describe the image and its content in detail.'}
         result = ocr_tool.run(input_params)
 
         self.assertIsNot(result, None)
@@ -78,8 +264,4 @@ class TestOcrTool(unittest.TestCase):
 
 
 if __name__ == '__main__':
-    from dotenv import load_dotenv
-
-    load_dotenv()
-
     unittest.main()
@@ -1,11 +1,15 @@
+import os
+import tempfile
 from unittest.mock import patch, MagicMock
 
 import pytest
+from PIL import Image
 from langsmith import unit
 from pydantic import ValidationError
 
+from fakes import FakePage, FakePdfDocument
 from tools import PdfToImagesTool
-from tools.PdfToImagesTool import PdfToImagesToolInput
+from tools.PdfToImagesTool import PdfToImagesToolInput, get_page_dir
 
 
 @unit
@@ -20,13 +24,14 @@ def test_file_does_not_exist():
 
 
 @unit
-def test_not_a_pdf_file(requests_mock):
+def test_not_a_pdf_file(mocker):
     tool = PdfToImagesTool()
     not_a_pdf_path = "/path/to/not_a_pdf.txt"
 
     # Mock for Path().is_file()
     with patch("pathlib.Path.is_file", return_value=True):
-        patch("pypdfium2.PdfDocument", side_effect=ValueError("Invalid PDF")).start()
+        # mocker undoes the patch at teardown, so it does not leak into other tests
+        mocker.patch("pypdfium2.PdfDocument", side_effect=ValueError("Invalid PDF"))
 
         input_params = {"path": not_a_pdf_path}
 
@@ -35,7 +40,7 @@ def test_not_a_pdf_file(requests_mock):
 
 
 @unit
-def test_pdf_with_no_pages(requests_mock):
+def test_pdf_with_no_pages(mocker):
     tool = PdfToImagesTool()
     empty_pdf_path = "/path/to/empty.pdf"
 
@@ -43,7 +48,7 @@ def test_pdf_with_no_pages(requests_mock):
 
     # Mock for Path().is_file()
     with patch("pathlib.Path.is_file", return_value=True):
-        patch("pypdfium2.PdfDocument", return_value=mock_pdf).start()
+        mocker.patch("pypdfium2.PdfDocument", return_value=mock_pdf)
         mock_pdf.__len__.return_value = 0
 
         input_params = {"path": empty_pdf_path}
@@ -52,6 +57,63 @@ def test_pdf_with_no_pages(requests_mock):
         assert result == []
 
 
+@pytest.fixture
+def page_tmpdir(tmp_path, monkeypatch):
+    # keep the page dir created by the tool out of the system temp dir
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    get_page_dir.cache_clear()
+    yield tmp_path
+    get_page_dir.cache_clear()
+
+
+@unit
+def test_pages_written_to_private_dir(mocker, page_tmpdir):
+    tool = PdfToImagesTool()
+
+    with patch("pathlib.Path.is_file", return_value=True):
+        mocker.patch(
+            "pypdfium2.PdfDocument",
+            return_value=FakePdfDocument([FakePage(), FakePage()]),
+        )
+        mocker.patch.object(
+            PdfToImagesTool,
+            "convert_to_pil_img",
+            return_value=Image.new("RGB", (10, 10)),
+        )
+
+        result = tool.run({"path": "/path/to/two_pages.pdf"})
+
+    assert [os.path.basename(path) for path in result] == ["page_0.png", "page_1.png"]
+    assert os.path.dirname(result[0]) == os.path.dirname(result[1])
+    assert os.path.dirname(os.path.dirname(result[0])) == str(page_tmpdir)
+    assert os.stat(os.path.dirname(result[0])).st_mode & 0o777 == 0o700
+    assert all(os.stat(path).st_mode & 0o777 == 0o600 for path in result)
+
+
+@unit
+def test_page_dir_is_reused_across_calls(mocker, page_tmpdir):
+    tool = PdfToImagesTool()
+
+    with patch("pathlib.Path.is_file", return_value=True):
+        mocker.patch(
+            "pypdfium2.PdfDocument",
+            side_effect=lambda path: FakePdfDocument([FakePage()] * 3),
+        )
+        mocker.patch.object(
+            PdfToImagesTool,
+            "convert_to_pil_img",
+            return_value=Image.new("RGB", (10, 10)),
+        )
+
+        results = [tool.run({"path": "/path/to/three_pages.pdf"}) for _ in range(20)]
+
+    # later calls overwrite the same page files, so the temp dir does not grow
+    assert all(result == results[0] for result in results)
+    page_dir = os.path.dirname(results[0][0])
+    assert sorted(os.listdir(page_dir)) == ["page_0.png", "page_1.png", "page_2.png"]
+    assert os.listdir(page_tmpdir) == [os.path.basename(page_dir)]
+
+
 @unit
 def test_invalid_input_params():
     with pytest.raises(ValidationError):
@@ -1,5 +1,6 @@
 import tempfile
-from unittest.mock import MagicMock, patch
+from collections import namedtuple
+from unittest.mock import patch
 
 import pytest
 from pydantic import ValidationError
@@ -7,33 +8,31 @@ from pydantic import ValidationError
 from tools import PrintDirectoryTool
 from tools.PrintDirectoryTool import PrintDirToolInput
 
+DirEntry = namedtuple("DirEntry", "name path is_file")
+
+_VALID_DIR = "/path/to/valid_dir"
+_EXPECTED_LISTING = "/path/to/valid_dir/file1.txt\n/path/to/valid_dir/file2.txt\n"
+
+
+def _entry(name, path, is_file):
+    return DirEntry(name, path, lambda: is_file)
+
 
 def test_directory_exists(mocker):
     tool = PrintDirectoryTool()
-    valid_dir_path = "/path/to/valid_dir"
 
-    # Mock os.path.exists and os.listdir
+    # Mock os.path.exists, the listing itself only goes through os.scandir
     mocker.patch("os.path.exists", return_value=True)
-    mocker.patch("os.listdir", return_value=["file1.txt", "file2.txt", "subdir"])
-    mock_file1 = MagicMock()
-    mock_file1.name = "file1.txt"
-    mock_file1.is_file.return_value = True
-    mock_file1.path = "/path/to/valid_dir/file1.txt"
-    mock_file2 = MagicMock()
-    mock_file2.name = "file2.txt"
-    mock_file2.is_file.return_value = True
-    mock_file2.path = "/path/to/valid_dir/file2.txt"
-    mock_subdir = MagicMock()
-    mock_subdir.name = "subdir"
-    mock_subdir.is_file.return_value = False
-    mock_subdir.path = "/path/to/valid_dir/subdir"
     with patch("os.scandir") as mock_scandir:
-        mock_scandir.return_value.__enter__.return_value = [mock_file1, mock_file2]
-        input_params = {"path": valid_dir_path, "recursive": False}
+        mock_scandir.return_value.__enter__.return_value = [
+            _entry("file1.txt", "/path/to/valid_dir/file1.txt", True),
+            _entry("file2.txt", "/path/to/valid_dir/file2.txt", True),
+            _entry("subdir", "/path/to/valid_dir/subdir", False),
+        ]
+        input_params = {"path": _VALID_DIR, "recursive": False}
         result = tool.run(input_params)
 
-        expected_output = "/path/to/valid_dir/file1.txt\n/path/to/valid_dir/file2.txt\n"
-        assert result["message"] == expected_output
+        assert result["message"] == _EXPECTED_LISTING
 
 
 def test_directory_does_not_exist():
@@ -1,21 +1,16 @@
-import os
+import importlib.util
 
 import pytest
 from pydantic import ValidationError
 from langsmith import unit
 
-from tools import SendEmailTool
 from tools.SendEmailTool import SendEmailToolInput
 
-try:
-    HAS_RESEND = True
-except ImportError:
-    HAS_RESEND = False
+HAS_RESEND = importlib.util.find_spec("resend") is not None
 
 
 @unit
-def test_send_email_smtp(mocker):
-    tool = SendEmailTool()
+def test_send_email_smtp(mocker, monkeypatch, send_email_tool):
     input_params = {
         "subject": "Test Subject",
         "mailto": "test@example.com",
@@ -23,21 +18,16 @@ def test_send_email_smtp(mocker):
     }
 
     # Mock environment variables
-    mocker.patch.dict(
-        os.environ,
-        {
-            "MAIL_METHOD": "SMTP",
-            "MAIL_FROM": "from@example.com",
-            "SMTP_PASSWORD": "password",
-        },
-    )
+    monkeypatch.setenv("MAIL_METHOD", "SMTP")
+    monkeypatch.setenv("MAIL_FROM", "from@example.com")
+    monkeypatch.setenv("SMTP_PASSWORD", "password")
 
     # Mock smtplib
     mock_smtp = mocker.patch("smtplib.SMTP")
     mock_smtp_instance = mock_smtp.return_value
     mock_smtp_instance.sendmail.return_value = None
 
-    result = tool.run(input_params)
+    result = send_email_tool.run(input_params)
 
     assert result["message"] == "Mail sent successfully"
     mock_smtp_instance.sendmail.assert_called_once()
@@ -45,8 +35,7 @@ def test_send_email_smtp(mocker):
 
 @unit
 @pytest.mark.skipif(not HAS_RESEND, reason="resend module not available")
-def test_send_email_resend(mocker):
-    tool = SendEmailTool()
+def test_send_email_resend(mocker, monkeypatch, send_email_tool):
     input_params = {
         "subject": "Test Subject",
         "mailto": "test@example.com",
@@ -54,14 +43,13 @@ def test_send_email_resend(mocker):
     }
 
     # Mock environment variables
-    mocker.patch.dict(
-        os.environ, {"MAIL_METHOD": "resend", "RESEND_API_KEY": "fake_api_key"}
-    )
+    monkeypatch.setenv("MAIL_METHOD", "resend")
+    monkeypatch.setenv("RESEND_API_KEY", "fake_api_key")
 
     # Mock resend.Emails.send
     mock_resend = mocker.patch("resend.Emails.send", return_value=None)
 
-    result = tool.run(input_params)
+    result = send_email_tool.run(input_params)
 
     assert result["message"] == "Mail sent successfully"
     mock_resend.assert_called_once_with(
@@ -75,8 +63,7 @@ def test_send_email_resend(mocker):
 
 
 @unit
-def test_mail_method_not_supported(mocker):
-    tool = SendEmailTool()
+def test_mail_method_not_supported(monkeypatch, send_email_tool):
     input_params = {
         "subject": "Test Subject",
         "mailto": "test@example.com",
@@ -84,9 +71,9 @@ def test_mail_method_not_supported(mocker):
     }
 
     # Mock environment variables
-    mocker.patch.dict(os.environ, {"MAIL_METHOD": "unsupported_method"})
+    monkeypatch.setenv("MAIL_METHOD", "unsupported_method")
 
-    result = tool.run(input_params)
+    result = send_email_tool.run(input_params)
 
     assert result["message"] == "Mail method not supported"
 
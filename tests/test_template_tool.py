@@ -1,59 +1,32 @@
 import pytest
 from langsmith import unit
 
-from tools import TemplateTool
-
 TWO_INPUT_RESPONSE = "Input1: value1, Input2: value2"
 
 
 @unit
-def test_template_tool_with_json_input():
-    tool = TemplateTool()
-    input_data = {"input1": "value1", "input2": "value2"}
-
-    result = tool.run(input=input_data)
-
-    expected_message = TWO_INPUT_RESPONSE
-    assert result["message"] == expected_message
-
-
-@unit
-def test_template_tool_with_string_input():
-    tool = TemplateTool()
-    input_data = '{"input1": "value1", "input2": "value2"}'
-
-    result = tool.run(input=input_data)
-
-    expected_message = TWO_INPUT_RESPONSE
-    assert result["message"] == expected_message
-
-
-@unit
-def test_template_tool_with_missing_input():
-    tool = TemplateTool()
-    input_data = {"input1": "value1"}
-
-    result = tool.run(input=input_data)
-
-    expected_message = "Input1: value1, Input2: None"
-    assert result["message"] == expected_message
-
-
-@unit
-def test_template_tool_with_extra_parameters():
-    tool = TemplateTool()
-    input_data = {"input1": "value1", "input2": "value2", "extra_param": "extra_value"}
-
-    result = tool.run(input=input_data)
+@pytest.mark.parametrize(
+    "input_data, expected_message",
+    [
+        ({"input1": "value1", "input2": "value2"}, TWO_INPUT_RESPONSE),
+        ('{"input1": "value1", "input2": "value2"}', TWO_INPUT_RESPONSE),
+        ({"input1": "value1"}, "Input1: value1, Input2: None"),
+        (
+            {"input1": "value1", "input2": "value2", "extra_param": "extra_value"},
+            TWO_INPUT_RESPONSE,
+        ),
+    ],
+    ids=["json_input", "string_input", "missing_input", "extra_parameters"],
+)
+def test_template_tool_valid_input(template_tool, input_data, expected_message):
+    result = template_tool.run(input=input_data)
 
-    expected_message = TWO_INPUT_RESPONSE
     assert result["message"] == expected_message
 
 
 @unit
-def test_template_tool_with_invalid_json():
-    tool = TemplateTool()
+def test_template_tool_with_invalid_json(template_tool):
     input_data = "Invalid JSON string"
 
     with pytest.raises(Exception):
-        tool.run(input=input_data)
+        template_tool.run(input=input_data)
@@ -1,4 +1,8 @@
+import functools
+import http.cookiejar
+import re
 from typing import Dict, Optional, Type
+from urllib.parse import quote, urlencode
 
 from copilot.core import etendo_utils
 from copilot.core.tool_input import ToolField, ToolInput
@@ -30,6 +34,40 @@ class APICallToolInput(ToolInput):
     )
 
 
+# Characters that quote() with safe="," leaves untouched
+_QUERY_SAFE_RE = re.compile(r"[A-Za-z0-9_.~,-]*")
+
+
+def quote_query_value(value, safe="", encoding=None, errors=None):
+    """
+    quote() replacement for urlencode that skips the encoding work when the value
+    has nothing to escape, the usual case for ids, numbers and flags. The shortcut
+    only applies to safe=",", the set used by APICallTool, other sets go to quote().
+    """
+    if safe == "," and _QUERY_SAFE_RE.fullmatch(value):
+        return value
+    return quote(value, safe, encoding, errors)
+
+
+@functools.lru_cache(maxsize=1)
+def get_session():
+    """
+    Returns the HTTP session shared by all API calls, so connections to the same
+    host are kept alive and reused instead of being opened on every request.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    # Only the connection pool is shared: a shared cookie jar would replay one caller's
+    # session cookies (e.g. Etendo's JSESSIONID) on another caller's requests
+    session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=50)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
 def do_request(body_params, endpoint, headers, method, url):
     """
     This function performs an HTTP request based on the provided parameters.
@@ -51,10 +89,10 @@ def do_request(body_params, endpoint, headers, method, url):
         return {"error": "endpoint is required"}
     if method is None or method == "":
         return {"error": "method is required"}
-    import requests
+    session = get_session()
 
     if method == "GET":
-        get_result = requests.get(url=(url + endpoint), headers=headers)
+        get_result = session.get(url=(url + endpoint), headers=headers)
         copilot_debug("GET method")
         copilot_debug("url: " + url + endpoint)
         copilot_debug("headers: " + str(headers))
@@ -67,7 +105,7 @@ def do_request(body_params, endpoint, headers, method, url):
         headers["Content-Type"] = "application/json"
         headers["Accept"] = "application/json"
         copilot_debug("headers: " + str(headers))
-        post_result = requests.post(
+        post_result = session.post(
             url=(url + endpoint), data=body_params, headers=headers
         )
         copilot_debug("response text: " + post_result.text)
@@ -97,20 +135,20 @@ def get_first_param(endpoint):
     return first_query_param
 
 
+# Methods that may prefix the endpoint, for example "GET /endpoint"
+_ENDPOINT_METHODS = frozenset(("GET", "POST"))
+
+
 def endpoint_not_none(endpoint, method):
-    if (
-        endpoint is not None
-        and endpoint.startswith("GET")
-        or endpoint.startswith("POST")
-    ):
-        prefix = endpoint.split(" ")[0]
-        endpoint = endpoint.split(" ")[1]
+    if endpoint is None:
+        return endpoint, method
+    prefix, sep, rest = endpoint.partition(" ")
+    if sep and prefix in _ENDPOINT_METHODS:
+        endpoint = rest
         # and if the method is not defined, set it to the method in the endpoint
         copilot_debug(f"Method = '{method}'")
         if method is None or method == "":
             method = prefix
-            # uppercase the method
-            method = method.upper()
     return endpoint, method
 
 
@@ -155,16 +193,22 @@ class APICallTool(ToolWrapper):
                     query_params = json.loads(query_params)
                 else:
                     return {"error": "query_params must be a json object"}
-                first_query_param = get_first_param(endpoint)
+                pairs = []
                 for key, value in query_params.items():
+                    # urlencode would send null or nested objects as their str()
+                    if value is None or isinstance(value, dict):
+                        return {
+                            "error": f"query param {key} must be a string, number, boolean or list"
+                        }
                     # if is a boolean, convert to string
                     if isinstance(value, (bool, int, float)):
                         value = str(value)
                     if isinstance(value, list):
                         value = ",".join(value)
-                    value_url_encoded = value.replace(" ", "%20")
-                    endpoint += f"{first_query_param}{key}={value_url_encoded}"
-                    first_query_param = "&"
+                    pairs.append((key, value))
+                query_string = urlencode(pairs, quote_via=quote_query_value, safe=",")
+                if query_string:
+                    endpoint += get_first_param(endpoint) + query_string
 
             copilot_debug(f"Method = '{method}'")
             api_response = do_request(body_params, endpoint, headers, method, url)
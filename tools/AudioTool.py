@@ -1,5 +1,6 @@
+import functools
+import mimetypes
 import os
-from pathlib import Path
 from typing import Type
 
 from langsmith import traceable
@@ -16,16 +17,20 @@ class AudioToolInput(ToolInput):
 @traceable
 def get_file_path(input_params):
     rel_path = input_params.get("path")
-    audio_path = "/app" + rel_path
-    copilot_debug(f"Tool AudioTool input: {audio_path}")
+    copilot_debug(f"Tool AudioTool input: /app{rel_path}")
     copilot_debug(f"Current directory: {os.getcwd()}")
-    if not Path(audio_path).exists():
-        audio_path = ".." + rel_path
-    if not Path(audio_path).exists():
-        audio_path = rel_path
-    if not Path(audio_path).is_file():
-        raise Exception(f"Filename {audio_path} doesn't exist")
-    return audio_path
+    for audio_path in ("/app" + rel_path, ".." + rel_path, rel_path):
+        if os.path.isfile(audio_path):
+            return audio_path
+    raise Exception(f"Filename {rel_path} doesn't exist")
+
+
+@functools.lru_cache(maxsize=1)
+def get_openai_client():
+    # Shared so consecutive transcriptions reuse the client's connection pool
+    from openai import OpenAI
+
+    return OpenAI()
 
 
 class AudioTool(ToolWrapper):
@@ -41,14 +46,14 @@ class AudioTool(ToolWrapper):
     def run(self, input_params, *args, **kwargs):
         try:
             file_path = get_file_path(input_params)
-            from openai import OpenAI
-
-            client = OpenAI()
-
-            audio_file = open(file_path, "rb")
-            transcription = client.audio.transcriptions.create(
-                model="whisper-1", file=audio_file
-            )
+            client = get_openai_client()
+
+            mime = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+            with open(file_path, "rb") as audio_file:
+                transcription = client.audio.transcriptions.create(
+                    model="whisper-1",
+                    file=(os.path.basename(file_path), audio_file, mime),
+                )
             print(transcription.text)
         except Exception as e:
             errmsg = f"An error occurred: {e}"
@@ -1,4 +1,6 @@
+import functools
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Type, Dict
 
 from copilot.core.tool_input import ToolInput, ToolField
@@ -12,21 +14,28 @@ class CodbarToolInput(ToolInput):
     )
 
 
-def decode(p_filepath):
+@functools.lru_cache(maxsize=256)
+def _decode_cached(p_filepath, mtime_ns, size):
+    # mtime_ns and size are only part of the key, so an edited file is decoded again
     from pyzbar.pyzbar import decode
     from PIL import Image
 
-    if not os.path.exists(p_filepath):
+    with Image.open(p_filepath) as img:
+        return tuple(d.data.decode("utf-8") for d in decode(img))
+
+
+def decode(p_filepath):
+    try:
+        stat = os.stat(p_filepath)
+    except OSError:
         print(f"File not found: {p_filepath}")
         return None
 
-    img = Image.open(p_filepath)
     try:
-        decoded_list = decode(img)
+        decoded_list = _decode_cached(p_filepath, stat.st_mtime_ns, stat.st_size)
         if len(decoded_list) == 0:
             return None
-        print(type(decoded_list[0]))
-        return [d.data.decode("utf-8") for d in decoded_list]
+        return list(decoded_list)
     except Exception as e:
         print(
             f"The CodbarTool failed to decode the image. Check requirements in Etendo documentation. Error: {e}"
@@ -50,10 +59,17 @@ class CodbarTool(ToolWrapper):
             raise ValueError("Expected 'filepath' to be a list of strings.")
 
         barcodes = []
-        for file in p_filepath:
-            barcode_number = decode(file)
+        if not p_filepath:
+            return {"message": barcodes}
+
+        # zbar decoding runs in C without the GIL, so the images are decoded
+        # concurrently; map keeps the results in input order
+        with ThreadPoolExecutor(max_workers=min(8, len(p_filepath))) as executor:
+            decoded = list(executor.map(decode, p_filepath))
+
+        for barcode_number in decoded:
             if barcode_number:
-                [barcodes.append(code) for code in barcode_number]
+                barcodes.extend(barcode_number)
                 print(f"Barcode Number: {barcode_number}")
 
         return {"message": barcodes}
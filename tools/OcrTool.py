@@ -1,9 +1,12 @@
-import base64
+import functools
+import io
 import os
-from pathlib import Path
+from collections import deque
+from types import MappingProxyType
 from typing import Final, Type
 
 from langsmith import traceable
+from langsmith.utils import ContextThreadPoolExecutor
 
 from copilot.core import utils
 from copilot.core.tool_input import ToolField, ToolInput
@@ -26,6 +29,14 @@ SUPPORTED_MIME_FORMATS = {
     "PDF": "application/pdf",
 }
 
+_SUPPORTED_MIMES = frozenset(SUPPORTED_MIME_FORMATS.values())
+
+# Long edge, in pixels, above which the vision model downscales its input anyway
+VISION_TARGET_PX = 2048
+PDF_RENDER_MAX_SCALE = 2
+PDF_RENDER_MIN_SCALE = 1
+JPEG_QUALITY = 85
+
 
 class OcrToolInput(ToolInput):
     path: str = ToolField(description="path of the image to be processed")
@@ -52,97 +63,249 @@ def convert_to_pil_img(bitmap):
         1,  # orientation (top->bottom)
     )
     image.readonly = False
+    # frombuffer aliases the pdfium memory, keep its owner alive as long as the image
+    image._pdfium_bitmap = bitmap
 
     return image
 
 
+_DATA_URL_PREFIXES = MappingProxyType(
+    {mime: f"data:{mime};base64," for mime in SUPPORTED_MIME_FORMATS.values()}
+)
+
+
 @traceable
 def get_image_payload_item(img_b64, mime):
+    prefix = _DATA_URL_PREFIXES.get(mime) or f"data:{mime};base64,"
     return {
         "type": "image_url",
-        "image_url": {"url": f"data:{mime};base64,{img_b64}", "detail": "high"},
+        "image_url": {"url": prefix + img_b64, "detail": "high"},
     }
 
 
 @traceable
 def checktype(ocr_image_url, mime):
-    if mime not in SUPPORTED_MIME_FORMATS.values():
+    if mime not in _SUPPORTED_MIMES:
         raise ValueError(
             f"File {ocr_image_url} invalid file format with mime {mime}. Supported formats: {SUPPORTED_MIME_FORMATS}."
         )
 
 
-@traceable
-def read_mime(ocr_image_url):
+# Magic numbers of the supported formats, all found in the first 12 bytes of the header.
+# Ordered by how often each format is sent to the tool.
+_MAGIC_SIGNATURES = (
+    (b"\xff\xd8\xff", SUPPORTED_MIME_FORMATS["JPEG"]),
+    (b"%PDF-", SUPPORTED_MIME_FORMATS["PDF"]),
+    (b"\x89PNG\r\n\x1a\n", SUPPORTED_MIME_FORMATS["PNG"]),
+    (b"RIFF", SUPPORTED_MIME_FORMATS["WEBP"]),
+    (b"GIF8", SUPPORTED_MIME_FORMATS["GIF"]),
+)
+
+
+# Bytes read from the file header, enough for the filetype matchers used as fallback
+_MIME_HEADER_SIZE = 262
+
+
+def _sniff_mime(head):
+    for signature, mime in _MAGIC_SIGNATURES:
+        if head.startswith(signature):
+            # RIFF is a generic container, WebP is flagged at offset 8
+            if mime == SUPPORTED_MIME_FORMATS["WEBP"] and head[8:12] != b"WEBP":
+                continue
+            return mime
+    return None
+
+
+def _guess_mime(ocr_image_url):
+    try:
+        with open(ocr_image_url, "rb") as file:
+            head = file.read(_MIME_HEADER_SIZE)
+    except OSError as e:
+        print(e)
+        return None
+    mime = _sniff_mime(head)
+    if mime is not None:
+        return mime
+
     import filetype
 
     try:
-        mime = filetype.guess(ocr_image_url).mime
+        # the header already read is enough for filetype, no need to reopen the file
+        mime = filetype.guess(head).mime
     except Exception as e:
         print(e)
         mime = None
     return mime
 
 
+@functools.lru_cache(maxsize=1024)
+def _guess_mime_cached(ocr_image_url, mtime_ns, size):
+    return _guess_mime(ocr_image_url)
+
+
+_EXT_TO_MIME = MappingProxyType(
+    {f".{fmt.lower()}": mime for fmt, mime in SUPPORTED_MIME_FORMATS.items()}
+)
+
+
+@traceable
+def read_mime(ocr_image_url):
+    # Whitelisted extensions are trusted, content sniffing is left for the rest
+    ext_mime = _EXT_TO_MIME.get(os.path.splitext(ocr_image_url)[1].lower())
+    if ext_mime is not None:
+        return ext_mime
+    try:
+        st = os.stat(ocr_image_url)
+    except OSError:
+        return _guess_mime(ocr_image_url)
+    # mtime and size in the key invalidate the entry when the file is replaced
+    return _guess_mime_cached(ocr_image_url, st.st_mtime_ns, st.st_size)
+
+
 @traceable
 def get_file_path(input_params):
     rel_path = input_params.get("path")
-    ocr_image_url = "/app" + rel_path
-    copilot_debug(f"Tool OcrTool input: {ocr_image_url}")
+    copilot_debug(f"Tool OcrTool input: /app{rel_path}")
     copilot_debug(f"Current directory: {os.getcwd()}")
-    if not Path(ocr_image_url).exists():
-        ocr_image_url = ".." + rel_path
-    if not Path(ocr_image_url).exists():
-        ocr_image_url = rel_path
-    if not Path(ocr_image_url).is_file():
-        raise FileNotFoundError(f"Filename {ocr_image_url} doesn't exist")
-    return ocr_image_url
+    for ocr_image_url in ("/app" + rel_path, ".." + rel_path, rel_path):
+        # isfile is a single stat covering both the exists and the regular file checks
+        if os.path.isfile(ocr_image_url):
+            return ocr_image_url
+    raise FileNotFoundError(f"Filename {rel_path} doesn't exist")
+
+
+def get_render_scale(page):
+    # page size is given in PDF points (1/72 inch), scale 1 renders at 72 dpi
+    long_edge_pt = max(page.get_size())
+    if long_edge_pt <= 0:
+        return PDF_RENDER_MAX_SCALE
+    scale = VISION_TARGET_PX / long_edge_pt
+    return min(PDF_RENDER_MAX_SCALE, max(PDF_RENDER_MIN_SCALE, scale))
+
+
+# Read size for base64 streaming, a multiple of 3 so no padding is emitted mid-stream
+_B64_CHUNK_SIZE = 3 * 1024 * 1024
 
 
 @traceable
 def image_to_base64(image_path):
+    import pybase64
+
+    encoded_chunks = []
     with open(image_path, "rb") as image_file:
-        image_binary_data = image_file.read()
-        base64_encoded = base64.b64encode(image_binary_data).decode("utf-8")
-        return base64_encoded
+        while chunk := image_file.read(_B64_CHUNK_SIZE):
+            encoded_chunks.append(pybase64.b64encode_as_string(chunk))
+    return "".join(encoded_chunks)
 
 
 @traceable
-def recopile_files(
-    base64_images, filenames_to_delete, folder_of_appended_file, mime, ocr_image_url
-):
-    import pypdfium2 as pdfium
+def pil_image_to_base64(pil_image):
+    import pybase64
+
+    buffer = io.BytesIO()
+    # The vision model only decodes the image once: optimized Huffman tables and
+    # progressive scans would cost encode time for a few percent of payload
+    pil_image.save(
+        buffer,
+        format="JPEG",
+        quality=JPEG_QUALITY,
+        optimize=False,
+        progressive=False,
+        subsampling="4:2:0",
+    )
+    # encode straight from the buffer memory, without a getvalue() copy or a decode step
+    with buffer.getbuffer() as view:
+        return pybase64.b64encode_as_string(view)
+
+
+def encode_image(ocr_image_url):
+    from PIL import Image, ImageOps
+
+    with Image.open(ocr_image_url) as img:
+        # integer box-filter factor that brings the long edge near the target
+        factor = max(img.size) // VISION_TARGET_PX
+        # the decoded format decides, not the extension: a mislabeled file is re-encoded
+        if img.format == "JPEG" and factor < 2:
+            return image_to_base64(ocr_image_url)
+        # re-encoding drops the EXIF orientation tag, so apply it to the pixels first
+        ImageOps.exif_transpose(img, in_place=True)
+        rgb_img = img.convert("RGB")
+    if factor >= 2:
+        rgb_img = rgb_img.reduce(factor)
+    return pil_image_to_base64(rgb_img)
+
+
+def _collect_page(base64_images, future, bitmap):
+    try:
+        base64_images.append(future.result())
+    finally:
+        # PDFium calls must not overlap, so the bitmap is released here on the rendering
+        # thread instead of by a finalizer running on whichever worker dropped it last
+        bitmap.close()
+
 
+@traceable
+def recopile_files(base64_images, mime, ocr_image_url):
     if mime == SUPPORTED_MIME_FORMATS["PDF"]:
+        # PDFium is only loaded when a PDF is actually processed
+        import pypdfium2 as pdfium
+
         pdf = pdfium.PdfDocument(ocr_image_url)
         n_pages = len(pdf)
-        uuid = os.urandom(16).hex()
-        for page_number in range(n_pages):
-            page = pdf.get_page(page_number)
-            bitmap = page.render(scale=2)
-            pil_image = convert_to_pil_img(bitmap)
-
-            page_image_filename = (
-                f"{folder_of_appended_file}/{uuid}image_{page_number + 1}.jpeg"
-            )
-            # delete the file if it exists
-            filenames_to_delete.append(page_image_filename)
-            pil_image.save(page_image_filename)
-            base64_images.append(image_to_base64(page_image_filename))
-    elif mime not in [SUPPORTED_MIME_FORMATS["JPEG"], SUPPORTED_MIME_FORMATS["JPG"]]:
-        # Convert to jpeg and get the base64
-        from PIL import Image
-
-        img = Image.open(ocr_image_url)
-        img = img.convert("RGB")
-        converted_image_filename = (
-            f"{folder_of_appended_file}/{os.urandom(16).hex()}converted_img.jpeg"
-        )
-        img.save(converted_image_filename)
-        base64_images.append(image_to_base64(converted_image_filename))
-        filenames_to_delete.append(converted_image_filename)
+        # PDFium is not thread-safe, so pages are rendered one by one and only the
+        # JPEG + base64 encoding (which releases the GIL) runs on the pool
+        max_workers = max(1, min(os.cpu_count() or 1, n_pages))
+        # rendered pages waiting for the pool, bounds the bitmaps held in memory
+        max_pending = 2 * max_workers
+        pending = deque()
+        try:
+            # the context pool keeps the encoding spans under the current trace
+            with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+                for page_number in range(n_pages):
+                    if len(pending) >= max_pending:
+                        _collect_page(base64_images, *pending.popleft())
+                    page = pdf.get_page(page_number)
+                    # rev_byteorder makes pdfium emit RGB, which PIL encodes without swizzling
+                    bitmap = page.render(
+                        scale=get_render_scale(page), rev_byteorder=True
+                    )
+                    pil_image = convert_to_pil_img(bitmap)
+                    future = executor.submit(pil_image_to_base64, pil_image)
+                    pending.append((future, bitmap))
+                while pending:
+                    _collect_page(base64_images, *pending.popleft())
+        finally:
+            # on failure the pool has finished by now, release what was never collected
+            for _, bitmap in pending:
+                bitmap.close()
     else:
-        base64_images.append(image_to_base64(ocr_image_url))
+        base64_images.append(encode_image(ocr_image_url))
+
+
+@traceable
+def build_messages(base64_images, question):
+    # Every image has been normalized to JPEG by recopile_files
+    mime = SUPPORTED_MIME_FORMATS["JPEG"]
+    # every page is sent, repeated ones included: the prompt asks not to omit repeated data
+    content = [get_image_payload_item(b64, mime) for b64 in base64_images]
+    return [
+        {"role": "user", "content": content},
+        {"role": "user", "content": question},
+    ]
+
+
+@functools.lru_cache(maxsize=8)
+def get_llm(openai_model):
+    # Shared per model so the HTTP connection pool survives between OCR requests
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model=openai_model,
+        temperature=0,
+        max_tokens=None,
+        timeout=None,
+        max_retries=2,
+    )
 
 
 class OcrTool(ToolWrapper):
@@ -170,41 +333,16 @@ class OcrTool(ToolWrapper):
             mime = read_mime(ocr_image_url)
             checktype(ocr_image_url, mime)
 
-            filenames_to_delete = []
             base64_images = []
-            folder_of_appended_file = os.path.dirname(ocr_image_url)
-            recopile_files(
-                base64_images,
-                filenames_to_delete,
-                folder_of_appended_file,
-                mime,
-                ocr_image_url,
-            )
-            mime = SUPPORTED_MIME_FORMATS["JPEG"]
+            recopile_files(base64_images, mime, ocr_image_url)
 
-            for filename_del in filenames_to_delete:
-                os.remove(filename_del)
-            content = []
             if "question" in input_params:
                 msg = input_params["question"]
             else:
                 msg = GET_JSON_PROMPT
-            for b64 in base64_images:
-                content.append(get_image_payload_item(b64, mime))
-            messages = [
-                {"role": "user", "content": content},
-                {"role": "user", "content": msg},
-            ]
-
-            from langchain_openai import ChatOpenAI
-
-            llm = ChatOpenAI(
-                model=openai_model,
-                temperature=0,
-                max_tokens=None,
-                timeout=None,
-                max_retries=2,
-            )
+            messages = build_messages(base64_images, msg)
+
+            llm = get_llm(openai_model)
             response_llm = llm.invoke(messages)
         except Exception as e:
             errmsg = f"An error occurred: {e}"
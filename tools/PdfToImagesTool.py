@@ -1,3 +1,6 @@
+import functools
+import os
+import tempfile
 from pathlib import Path
 from typing import Type
 
@@ -10,6 +13,33 @@ class PdfToImagesToolInput(ToolInput):
     path: str = ToolField(description="Path of the PDF to be converted")
 
 
+@functools.lru_cache(maxsize=1)
+def get_page_dir():
+    """
+    Returns the directory shared by all calls for their page images. It is created
+    on first use by mkdtemp, so only the user running the process can access it.
+    """
+    return tempfile.mkdtemp(prefix="pdf_pages_")
+
+
+def save_page(pil_image, page_dir, page_number):
+    """
+    Saves the page as page_N.png, replacing the one written by an earlier call so
+    the directory never holds more files than the longest PDF has pages.
+    """
+    image_path = os.path.join(page_dir, f"page_{page_number}.png")
+    # mkstemp creates the file exclusively with 0o600, the rename swaps it in atomically
+    fd, tmp_path = tempfile.mkstemp(suffix=".png", dir=page_dir)
+    try:
+        with os.fdopen(fd, "wb") as image_file:
+            pil_image.save(image_file, format="PNG")
+        os.replace(tmp_path, image_path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return image_path
+
+
 class PdfToImagesTool(ToolWrapper):
     name: str = "PdfToImagesTool"
     description: str = "Converts a PDF file into an array of images, each representing a page of the PDF."
@@ -32,6 +62,8 @@ class PdfToImagesTool(ToolWrapper):
             1,  # orientation (top->bottom)
         )
         image.readonly = False
+        # same bitmap keepalive as OcrTool.convert_to_pil_img
+        image._pdfium_bitmap = bitmap
         return image
 
     def run(self, input_params, *args, **kwargs):
@@ -46,15 +78,18 @@ class PdfToImagesTool(ToolWrapper):
             pdf = pdfium.PdfDocument(pdf_path)
             n_pages = len(pdf)
             images = []
+            page_dir = get_page_dir() if n_pages else None
+            if page_dir:
+                # recreate it if a temp cleaner removed it while the process was running
+                os.makedirs(page_dir, mode=0o700, exist_ok=True)
 
             for page_number in range(n_pages):
                 page = pdf.get_page(page_number)
                 bitmap = page.render(scale=2.0)
                 pil_image = self.convert_to_pil_img(bitmap)
-                # store the image to a temp path
-                pil_image.save(f"/tmp/page_{page_number}.png")
+                image_path = save_page(pil_image, page_dir, page_number)
                 # append temp file path to the images list
-                images.append(f"/tmp/page_{page_number}.png")
+                images.append(image_path)
 
             return images
         except Exception as e: